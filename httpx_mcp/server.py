@@ -4,13 +4,18 @@ HTTPX MCP Server - HTTP Request Testing Tool
 Provides the following MCP tools:
 - http_request: Send HTTP requests (GET, POST, PUT, DELETE, PATCH, etc.)
 - http_raw: Parse raw HTTP requests (supports Burp Suite capture format)
+- http_request_many: Send a batch of HTTP requests concurrently
 """
 
+import asyncio
 import json
+import re
 import sys
 from typing import Any
+from urllib.parse import unquote_plus
 
 import httpx
+import orjson
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
@@ -18,45 +23,118 @@ from mcp.types import Tool, TextContent
 # Create MCP server
 server = Server("httpx-mcp")
 
+# "Key: Value" header lines
+_HEADER_RE = re.compile(r"^[ \t]*([^:\s][^:\r\n]*?)[ \t]*:[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+_RAW_HEADER_RE = re.compile(rb"^[ \t]*([^:\s][^:\r\n]*?)[ \t]*:[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+
+# Blank line (possibly holding spaces/tabs) separating head and body
+_BLANK_LINE_RE = re.compile(rb"\r?\n[ \t]*\r?\n")
+
+# Digit runs that may not fit in a 64-bit integer (19 digits already covers
+# values below the int64 minimum); orjson would parse these as floats
+_WIDE_INT_RE = re.compile(rb"\d{19,}")
+
+# JSON bodies larger than this are returned as-is instead of pretty-printed
+MAX_PRETTY = 256 * 1024
+
+# Responses larger than this are formatted in a worker thread
+MAX_INLINE_FORMAT = 64 * 1024
+
+# Host ports that imply HTTPS in raw requests
+_TLS_PORTS = frozenset({"443", "8443"})
+
+# Shared connection pools, keyed by verify_ssl
+_TRANSPORTS: dict[bool, httpx.AsyncHTTPTransport] = {}
+
+
+def get_client(verify_ssl: bool = True, follow_redirects: bool = True) -> httpx.AsyncClient:
+    """Get an HTTP client for one tool call, reusing pooled connections.
+
+    Each call gets its own client, and so its own cookie jar: cookies set
+    during a redirect chain are replayed within the call, but never leak
+    into later calls. Don't close the client, that would close the shared
+    transport.
+    """
+    key = bool(verify_ssl)
+    transport = _TRANSPORTS.get(key)
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            verify=verify_ssl
+        )
+        _TRANSPORTS[key] = transport
+    return httpx.AsyncClient(transport=transport, follow_redirects=follow_redirects)
+
+
+async def close_clients():
+    """Close all pooled connections"""
+    transports = list(_TRANSPORTS.values())
+    _TRANSPORTS.clear()
+    for transport in transports:
+        await transport.aclose()
+
 
 def format_response(response: httpx.Response, include_headers: bool = True) -> str:
     """Format HTTP response into a readable string"""
-    result_parts = []
-    
     # Status line
-    result_parts.append(f"HTTP/{response.http_version} {response.status_code} {response.reason_phrase}")
-    result_parts.append("")
+    status_line = f"HTTP/{response.http_version} {response.status_code} {response.reason_phrase}"
     
     # Response headers
     if include_headers:
-        result_parts.append("=== Response Headers ===")
-        for name, value in response.headers.items():
-            result_parts.append(f"{name}: {value}")
-        result_parts.append("")
+        # Raw pairs keep the server's header-name casing and print repeated
+        # headers (e.g. Set-Cookie) on separate lines instead of merging them
+        headers = response.headers
+        header_lines = b"".join(name + b": " + value + b"\n" for name, value in headers.raw)
+        header_lines = header_lines.decode(headers.encoding, errors="replace")
+        header_section = f"=== Response Headers ===\n{header_lines}\n"
+    else:
+        header_section = ""
     
     # Response body
-    result_parts.append("=== Response Body ===")
-    
     content_type = response.headers.get("content-type", "")
-    body = response.text
+    raw = response.content
+    size = len(raw)
+    body = None
     
-    # Try to format JSON
-    if "application/json" in content_type:
+    # Try to format JSON (orjson parses bytes directly). Bodies that may hold
+    # integers wider than 64 bits go through stdlib json, which keeps them exact.
+    if "application/json" in content_type and size <= MAX_PRETTY:
         try:
-            parsed = json.loads(body)
-            body = json.dumps(parsed, indent=2, ensure_ascii=False)
-        except json.JSONDecodeError:
+            if _WIDE_INT_RE.search(raw):
+                body = json.dumps(json.loads(raw), indent=2, ensure_ascii=False)
+            else:
+                body = orjson.dumps(orjson.loads(raw), option=orjson.OPT_INDENT_2).decode()
+        except (ValueError, orjson.JSONEncodeError):
             pass
     
-    result_parts.append(body)
+    if body is None:
+        body = raw.decode(response.encoding or "utf-8", errors="replace")
     
-    # Add response time
-    result_parts.append("")
-    result_parts.append(f"=== Request Info ===")
-    result_parts.append(f"Time: {response.elapsed.total_seconds():.3f}s")
-    result_parts.append(f"Size: {len(response.content)} bytes")
-    
-    return "\n".join(result_parts)
+    return (
+        f"{status_line}\n\n"
+        f"{header_section}"
+        f"=== Response Body ===\n{body}\n\n"
+        f"=== Request Info ===\n"
+        f"Time: {response.elapsed.total_seconds():.3f}s\n"
+        f"Size: {size} bytes"
+    )
+
+
+async def format_response_async(response: httpx.Response, include_headers: bool = True) -> str:
+    """Format HTTP response, offloading large bodies to a worker thread"""
+    if len(response.content) > MAX_INLINE_FORMAT:
+        return await asyncio.to_thread(format_response, response, include_headers)
+    return format_response(response, include_headers)
+
+
+def encode_body(body: str | bytes | bytearray | None) -> bytes | bytearray | None:
+    """Encode request body, passing bytes through unchanged"""
+    if not body:
+        return None
+    if isinstance(body, (bytes, bytearray)):
+        return body
+    return body.encode("ascii") if body.isascii() else body.encode()
 
 
 def parse_headers(headers_input: str | dict | list | None) -> dict:
@@ -70,9 +148,10 @@ def parse_headers(headers_input: str | dict | list | None) -> dict:
     if isinstance(headers_input, list):
         result = {}
         for item in headers_input:
-            if isinstance(item, str) and ":" in item:
-                key, value = item.split(":", 1)
-                result[key.strip()] = value.strip()
+            if isinstance(item, str):
+                key, sep, value = item.partition(":")
+                if sep:
+                    result[key.strip()] = value.strip()
             elif isinstance(item, dict):
                 result.update(item)
         return result
@@ -80,22 +159,16 @@ def parse_headers(headers_input: str | dict | list | None) -> dict:
     if isinstance(headers_input, str):
         # Try to parse as JSON
         try:
-            parsed = json.loads(headers_input)
+            parsed = orjson.loads(headers_input)
             if isinstance(parsed, dict):
                 return parsed
             elif isinstance(parsed, list):
                 return parse_headers(parsed)
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
         
         # Parse line by line "Key: Value" format
-        result = {}
-        for line in headers_input.strip().split("\n"):
-            line = line.strip()
-            if ":" in line:
-                key, value = line.split(":", 1)
-                result[key.strip()] = value.strip()
-        return result
+        return {m.group(1): m.group(2) for m in _HEADER_RE.finditer(headers_input)}
     
     return {}
 
@@ -110,26 +183,26 @@ def parse_params(params_input: str | dict | None) -> dict | None:
     
     if isinstance(params_input, str):
         try:
-            return json.loads(params_input)
-        except json.JSONDecodeError:
+            return orjson.loads(params_input)
+        except orjson.JSONDecodeError:
             # Parse key=value&key2=value2 format
+            # Strip before decoding so encoded edge spaces (%20) are kept
             result = {}
             for pair in params_input.split("&"):
-                if "=" in pair:
-                    key, value = pair.split("=", 1)
-                    result[key.strip()] = value.strip()
+                key, _, value = pair.partition("=")
+                key = key.strip()
+                if key:
+                    result[unquote_plus(key)] = unquote_plus(value.strip())
             return result if result else None
     
     return None
 
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """List all available MCP tools"""
-    return [
-        Tool(
-            name="http_request",
-            description="""Send HTTP request to specified URL. Supports all HTTP methods (GET/POST/PUT/DELETE/PATCH, etc.).
+# MCP tool definitions, built once at import
+_TOOLS = [
+    Tool(
+        name="http_request",
+        description="""Send HTTP request to specified URL. Supports all HTTP methods (GET/POST/PUT/DELETE/PATCH, etc.).
 
 Usage examples:
 - GET request: method="GET", url="https://api.example.com/users"
@@ -139,63 +212,63 @@ Usage examples:
 - DELETE: method="DELETE", url="https://api.example.com/users/1"
 - Custom headers: headers='{"Authorization":"Bearer xxx"}'
 - Form submit: body="name=test&age=18", content_type="application/x-www-form-urlencoded" """,
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "method": {
-                        "type": "string",
-                        "description": "HTTP method: GET, POST, PUT, DELETE, PATCH, HEAD, OPTIONS",
-                        "enum": ["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"],
-                        "default": "GET"
-                    },
-                    "url": {
-                        "type": "string",
-                        "description": "Full URL for the request"
-                    },
-                    "params": {
-                        "type": "string",
-                        "description": "URL query parameters, JSON format or key=value&key2=value2 format"
-                    },
-                    "headers": {
-                        "type": "string",
-                        "description": "Request headers, JSON format, e.g.: {\"Authorization\": \"Bearer xxx\"}"
-                    },
-                    "body": {
-                        "type": "string",
-                        "description": "Request body, can be JSON string, form data, or raw text"
-                    },
-                    "content_type": {
-                        "type": "string",
-                        "description": "Content-Type, e.g.: application/json, application/x-www-form-urlencoded",
-                        "default": "application/json"
-                    },
-                    "timeout": {
-                        "type": "number",
-                        "description": "Request timeout in seconds",
-                        "default": 30
-                    },
-                    "follow_redirects": {
-                        "type": "boolean",
-                        "description": "Whether to follow redirects",
-                        "default": True
-                    },
-                    "verify_ssl": {
-                        "type": "boolean",
-                        "description": "Whether to verify SSL certificate",
-                        "default": True
-                    },
-                    "include_headers": {
-                        "type": "boolean",
-                        "description": "Whether to include response headers in the output",
-                        "default": True
-                    }
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "method": {
+                    "type": "string",
+                    "description": "HTTP method: GET, POST, PUT, DELETE, PATCH, HEAD, OPTIONS",
+                    "enum": ["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"],
+                    "default": "GET"
+                },
+                "url": {
+                    "type": "string",
+                    "description": "Full URL for the request"
+                },
+                "params": {
+                    "type": "string",
+                    "description": "URL query parameters, JSON format or key=value&key2=value2 format"
+                },
+                "headers": {
+                    "type": "string",
+                    "description": "Request headers, JSON format, e.g.: {\"Authorization\": \"Bearer xxx\"}"
+                },
+                "body": {
+                    "type": "string",
+                    "description": "Request body, can be JSON string, form data, or raw text"
+                },
+                "content_type": {
+                    "type": "string",
+                    "description": "Content-Type, e.g.: application/json, application/x-www-form-urlencoded",
+                    "default": "application/json"
+                },
+                "timeout": {
+                    "type": "number",
+                    "description": "Request timeout in seconds",
+                    "default": 30
+                },
+                "follow_redirects": {
+                    "type": "boolean",
+                    "description": "Whether to follow redirects",
+                    "default": True
                 },
-                "required": ["url"]
-            }
-        ),
-        Tool(
-            name="http_raw",
-            description="""Send raw HTTP request. Supports pasting request format directly from Burp Suite or other capture tools.
+                "verify_ssl": {
+                    "type": "boolean",
+                    "description": "Whether to verify SSL certificate",
+                    "default": True
+                },
+                "include_headers": {
+                    "type": "boolean",
+                    "description": "Whether to include response headers in the output",
+                    "default": True
+                }
+            },
+            "required": ["url"]
+        }
+    ),
+    Tool(
+        name="http_raw",
+        description="""Send raw HTTP request. Supports pasting request format directly from Burp Suite or other capture tools.
 
 Raw request format example:
 POST /api/login HTTP/1.1
@@ -203,45 +276,81 @@ Host: example.com
 Content-Type: application/json
 
 {"username":"admin","password":"123"}""",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "raw_request": {
-                        "type": "string",
-                        "description": "Raw HTTP request text (including request line, headers, blank line, body)"
-                    },
-                    "base_url": {
-                        "type": "string",
-                        "description": "Base URL (if raw_request doesn't contain full URL), e.g.: https://example.com"
-                    },
-                    "verify_ssl": {
-                        "type": "boolean",
-                        "description": "Whether to verify SSL certificate",
-                        "default": True
-                    }
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "raw_request": {
+                    "type": "string",
+                    "description": "Raw HTTP request text (including request line, headers, blank line, body)"
                 },
-                "required": ["raw_request"]
-            }
-        )
-    ]
+                "base_url": {
+                    "type": "string",
+                    "description": "Base URL (if raw_request doesn't contain full URL), e.g.: https://example.com"
+                },
+                "verify_ssl": {
+                    "type": "boolean",
+                    "description": "Whether to verify SSL certificate",
+                    "default": True
+                }
+            },
+            "required": ["raw_request"]
+        }
+    ),
+    Tool(
+        name="http_request_many",
+        description="""Send multiple HTTP requests concurrently and return all responses in order. Each item takes the same arguments as http_request.
+All requests are started at once; beyond the pool's 100 connections they wait for a free connection and may fail with PoolTimeout.
+
+Usage example:
+- requests=[{"url":"https://api.example.com/users/1"}, {"method":"POST","url":"https://api.example.com/users","body":"{\\"name\\":\\"test\\"}"}]""",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "requests": {
+                    "type": "array",
+                    "description": "List of requests, each an object with http_request arguments (url, method, params, headers, body, ...)",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "url": {"type": "string"},
+                            "method": {"type": "string"}
+                        },
+                        "required": ["url"]
+                    }
+                }
+            },
+            "required": ["requests"]
+        }
+    )
+]
+
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """List all available MCP tools"""
+    return _TOOLS
 
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     """Execute MCP tool call"""
     try:
-        if name == "http_request":
-            return await handle_http_request(arguments)
-        elif name == "http_raw":
-            return await handle_http_raw(arguments)
-        else:
+        handler = _HANDLERS.get(name)
+        if handler is None:
             return [TextContent(type="text", text=f"Unknown tool: {name}")]
+        return await handler(arguments)
     except Exception as e:
         return [TextContent(type="text", text=f"Error: {type(e).__name__}: {str(e)}")]
 
 
 async def handle_http_request(args: dict[str, Any]) -> list[TextContent]:
     """Handle general HTTP request"""
+    result = await send_http_request(args)
+    return [TextContent(type="text", text=result)]
+
+
+async def send_http_request(args: dict[str, Any]) -> str:
+    """Send a single http_request call and return the formatted response"""
     method = args.get("method", "GET").upper()
     url = args["url"]
     params = parse_params(args.get("params"))
@@ -254,52 +363,80 @@ async def handle_http_request(args: dict[str, Any]) -> list[TextContent]:
     include_headers = args.get("include_headers", True)
     
     # Set Content-Type
-    if body and "content-type" not in {k.lower() for k in headers}:
+    if body and not any(k.lower() == "content-type" for k in headers):
         headers["Content-Type"] = content_type
     
-    async with httpx.AsyncClient(
-        timeout=timeout,
-        follow_redirects=follow_redirects,
-        verify=verify_ssl
-    ) as client:
-        response = await client.request(
-            method=method,
-            url=url,
-            params=params,
-            headers=headers,
-            content=body.encode() if body else None
-        )
-        
-        result = format_response(response, include_headers)
-        return [TextContent(type="text", text=result)]
+    client = get_client(verify_ssl, follow_redirects)
+    response = await client.request(
+        method=method,
+        url=url,
+        params=params,
+        headers=headers,
+        content=encode_body(body),
+        timeout=timeout
+    )
+    
+    return await format_response_async(response, include_headers)
+
+
+async def send_batch_item(item: Any) -> str:
+    """Send one http_request_many item, rejecting entries that are not objects"""
+    if not isinstance(item, dict):
+        raise TypeError(f"request must be an object, got {type(item).__name__}")
+    return await send_http_request(item)
 
 
-def parse_raw_request(raw: str, base_url: str | None = None) -> tuple[str, str, dict, str | None]:
-    """Parse raw HTTP request text"""
-    lines = raw.strip().replace("\r\n", "\n").split("\n")
+async def handle_http_request_many(args: dict[str, Any]) -> list[TextContent]:
+    """Handle a batch of HTTP requests, sent concurrently over the shared clients"""
+    requests = args["requests"]
+    if isinstance(requests, str):
+        requests = orjson.loads(requests)
+    
+    if not isinstance(requests, list):
+        raise TypeError("requests must be a list of request objects")
+    if not requests:
+        raise ValueError("No requests given")
+    
+    results = await asyncio.gather(
+        *(send_batch_item(item) for item in requests),
+        return_exceptions=True
+    )
+    
+    sections = []
+    for i, (item, result) in enumerate(zip(requests, results), 1):
+        if isinstance(result, Exception):
+            result = f"Error: {type(result).__name__}: {str(result)}"
+        if isinstance(item, dict):
+            title = f"{str(item.get('method', 'GET')).upper()} {item.get('url', '')}"
+        else:
+            title = "(invalid)"
+        sections.append(f"##### Request {i}: {title} #####\n{result}")
+    
+    return [TextContent(type="text", text="\n\n".join(sections))]
+
+
+def parse_raw_request(raw: str | bytes, base_url: str | None = None) -> tuple[str, str, dict, bytes | None]:
+    """Parse raw HTTP request text, keeping the body as bytes"""
+    data = (raw.encode() if isinstance(raw, str) else raw).strip()
+    
+    # Split head and body on the first blank line (CRLF or bare LF)
+    sep = _BLANK_LINE_RE.search(data)
+    if sep:
+        head, body = data[:sep.start()], data[sep.end():]
+    else:
+        head, body = data, b""
+    request_line, _, header_block = head.partition(b"\n")
     
     # Parse request line
-    request_line = lines[0]
-    parts = request_line.split()
+    parts = request_line.decode("utf-8", errors="replace").split()
     method = parts[0].upper()
     path = parts[1] if len(parts) > 1 else "/"
     
     # Parse request headers
-    headers = {}
-    body_start = len(lines)
-    
-    for i, line in enumerate(lines[1:], 1):
-        if line.strip() == "":
-            body_start = i + 1
-            break
-        if ":" in line:
-            key, value = line.split(":", 1)
-            headers[key.strip()] = value.strip()
-    
-    # Parse request body
-    body = None
-    if body_start < len(lines):
-        body = "\n".join(lines[body_start:])
+    headers = {
+        m.group(1).decode("latin-1"): m.group(2).decode("latin-1")
+        for m in _RAW_HEADER_RE.finditer(header_block)
+    }
     
     # Build full URL
     if path.startswith("http://") or path.startswith("https://"):
@@ -309,13 +446,14 @@ def parse_raw_request(raw: str, base_url: str | None = None) -> tuple[str, str,
         if base_url:
             url = base_url.rstrip("/") + path
         elif host:
-            # Determine protocol based on SSL-related headers
-            protocol = "https" if "443" in host else "http"
+            # Determine protocol based on the Host port
+            _, _, port = host.rpartition(":")
+            protocol = "https" if port in _TLS_PORTS else "http"
             url = f"{protocol}://{host}{path}"
         else:
             url = path
     
-    return method, url, headers, body
+    return method, url, headers, body or None
 
 
 async def handle_http_raw(args: dict[str, Any]) -> list[TextContent]:
@@ -326,35 +464,42 @@ async def handle_http_raw(args: dict[str, Any]) -> list[TextContent]:
     
     method, url, headers, body = parse_raw_request(raw_request, base_url)
     
-    async with httpx.AsyncClient(
-        timeout=30,
-        follow_redirects=True,
-        verify=verify_ssl
-    ) as client:
-        response = await client.request(
-            method=method,
-            url=url,
-            headers=headers,
-            content=body.encode() if body else None
-        )
-        
-        result = format_response(response)
-        return [TextContent(type="text", text=result)]
+    client = get_client(verify_ssl, True)
+    response = await client.request(
+        method=method,
+        url=url,
+        headers=headers,
+        content=encode_body(body),
+        timeout=30
+    )
+    
+    result = await format_response_async(response)
+    return [TextContent(type="text", text=result)]
+
+
+# Tool name -> handler
+_HANDLERS = {
+    "http_request": handle_http_request,
+    "http_raw": handle_http_raw,
+    "http_request_many": handle_http_request_many,
+}
 
 
 async def run_server():
     """Run MCP server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        await close_clients()
 
 
 def main():
     """Main entry point"""
-    import asyncio
     asyncio.run(run_server())
 
 